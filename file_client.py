@@ -1,19 +1,84 @@
+import errno
 import socket
 import os
-import json
+import hashlib
+import mmap
+import select
+import struct
 import sys
+import time
+
+# orjson decodes bytes directly and is several times faster; fall back
+# to the standard library when it isn't installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    import json
+    json_loads = json.loads
+
+# Linux-only flag to hold back a short header until the payload follows
+MSG_MORE = getattr(socket, 'MSG_MORE', 0)
+
+# Per-call read size for file transfers and kernel socket buffer size
+CHUNK_SIZE = 64 * 1024
+SOCKET_BUFFER_SIZE = 1024 * 1024
+
+# Control frames: a request is opcode + digest length + filename length
+# followed by the filename and an optional SHA-256 digest of the upload; a
+# response is status + size + payload length followed by any remaining
+# response fields as JSON
+REQUEST_HEADER = struct.Struct('!BBH')
+RESPONSE_HEADER = struct.Struct('!BQI')
+OPCODES = {'LIST': 1, 'UPLOAD': 2, 'DOWNLOAD': 3, 'DELETE': 4, 'QUIT': 5}
+STATUSES = ('success', 'error')
+
+# MSG_ZEROCOPY (Linux 4.14+); older Pythons don't export the constants.
+# Below ZEROCOPY_MIN_SIZE pinning pages costs more than the copy it saves
+ZEROCOPY_SUPPORTED = sys.platform.startswith('linux') and hasattr(socket, 'MSG_ERRQUEUE')
+SO_ZEROCOPY = getattr(socket, 'SO_ZEROCOPY', 60)
+MSG_ZEROCOPY = getattr(socket, 'MSG_ZEROCOPY', 0x4000000)
+SO_EE_ORIGIN_ZEROCOPY = 5
+ZEROCOPY_MIN_SIZE = 10 * 1024
+# struct sock_extended_err: errno, origin, type, code, pad, info, data
+SOCK_EXTENDED_ERR = struct.Struct('=IBBBBII')
 
 class FileClient:
-    def __init__(self, host='localhost', port=8888):
+    def __init__(self, host='localhost', port=8888, abort_on_close=False, zerocopy=False, checksum=False):
         self.host = host
         self.port = port
+        # Reset the connection on close instead of leaving it in TIME_WAIT;
+        # meant for short-lived command connections
+        self.abort_on_close = abort_on_close
+        # Send large uploads with MSG_ZEROCOPY from an mmap instead of sendfile
+        self.zerocopy = zerocopy and ZEROCOPY_SUPPORTED
+        # Send a SHA-256 of each upload for the server to verify. Off by
+        # default: the digest goes in the request header, so it costs a full
+        # extra read of the file before sending, and the server can only
+        # splice unchecked uploads to disk without copying them
+        self.checksum = checksum
         self.client_socket = None
         self.connected = False
+        # Encoded requests waiting to be written in one sendall
+        self._wbuf = bytearray()
 
     def connect(self):
         """Connect to file server"""
         try:
             self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # Disable Nagle so small request/response frames aren't delayed
+            self.client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # Size kernel buffers before connecting so the TCP window can scale to them
+            self.client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+            self.client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+            if self.abort_on_close:
+                self.client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            if self.zerocopy:
+                try:
+                    self.client_socket.setsockopt(socket.SOL_SOCKET, SO_ZEROCOPY, 1)
+                except OSError:
+                    # Kernel predates MSG_ZEROCOPY
+                    self.zerocopy = False
             self.client_socket.connect((self.host, self.port))
             self.connected = True
             print(f"[CLIENT] Connected to file server at {self.host}:{self.port}")
@@ -31,88 +96,214 @@ class FileClient:
                 self.send_request(request)
                 response = self.receive_response()
 
+                # Send our FIN now rather than whenever the socket is collected
+                self.client_socket.shutdown(socket.SHUT_RDWR)
+            except:
+                pass
+            finally:
                 self.client_socket.close()
                 self.connected = False
                 print("[CLIENT] Disconnected from server")
-            except:
-                pass
 
-    def send_request(self, request):
-        """Send request to server"""
-        try:
-            request_json = json.dumps(request)
-            request_bytes = request_json.encode('utf-8')
+    def __enter__(self):
+        if not self.connect():
+            raise ConnectionError(f"Could not connect to {self.host}:{self.port}")
+        return self
 
-            # Send request length first
-            length = len(request_bytes)
-            self.client_socket.send(length.to_bytes(4, byteorder='big'))
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disconnect()
 
-            # Send request data
-            self.client_socket.send(request_bytes)
+    def _encode_request(self, request):
+        """Encode a request dict as a binary request frame"""
+        name_bytes = request.get('filename', '').encode('utf-8')
+        digest = request.get('sha256', b'')
+        return REQUEST_HEADER.pack(OPCODES[request['command']], len(digest), len(name_bytes)) + name_bytes + digest
+
+    def send_request(self, request, flush=True):
+        """Send request to server, or queue it in the write buffer if flush is False"""
+        try:
+            self._wbuf += self._encode_request(request)
+            if flush or len(self._wbuf) >= CHUNK_SIZE:
+                self._flush()
         except Exception as e:
             print(f"[CLIENT] Error sending request: {e}")
             raise
 
+    def _flush(self):
+        """Write all buffered requests to server"""
+        if self._wbuf:
+            self.client_socket.sendall(self._wbuf)
+            self._wbuf.clear()
+
+    def pipeline(self, requests):
+        """Send several requests in one write, then read their responses in order
+
+        Only for commands without file data (LIST, DELETE); the server
+        answers requests strictly in the order it receives them.
+        """
+        for request in requests:
+            self.send_request(request, flush=False)
+        self._flush()
+        return [self.receive_response() for _ in requests]
+
+    def _recv_exact(self, n):
+        """Receive exactly n bytes from server, or None if the connection closes"""
+        buf = bytearray(n)
+        view = memoryview(buf)
+        received = 0
+        while received < n:
+            count = self.client_socket.recv_into(view[received:])
+            if not count:
+                return None
+            received += count
+        return buf
+
     def receive_response(self):
         """Receive response from server"""
         try:
-            # Receive response length
-            length_bytes = self.client_socket.recv(4)
-            if len(length_bytes) != 4:
+            # Never wait on a reply to a request still sitting in the buffer
+            self._flush()
+
+            # Receive fixed response header
+            header = self._recv_exact(RESPONSE_HEADER.size)
+            if header is None:
                 return None
 
-            response_length = int.from_bytes(length_bytes, byteorder='big')
+            status, size, payload_length = RESPONSE_HEADER.unpack(header)
 
-            # Receive response data
-            response_data = self.client_socket.recv(response_length)
-            if not response_data:
-                return None
+            # Receive any remaining response fields
+            response = {}
+            if payload_length:
+                payload = self._recv_exact(payload_length)
+                if payload is None:
+                    return None
+                response = json_loads(payload)
 
-            return json.loads(response_data.decode('utf-8'))
+            response['status'] = STATUSES[status]
+            response['size'] = size
+            return response
         except Exception as e:
             print(f"[CLIENT] Error receiving response: {e}")
             return None
 
+    def file_digest(self, filepath):
+        """Compute the SHA-256 digest of a file, streaming through one buffer"""
+        digest = hashlib.sha256()
+        buf = bytearray(CHUNK_SIZE)
+        view = memoryview(buf)
+        with open(filepath, 'rb') as f:
+            while True:
+                count = f.readinto(buf)
+                if not count:
+                    break
+                digest.update(view[:count])
+        return digest.digest()
+
     def send_file_data(self, filepath):
         """Send file data to server"""
         try:
             with open(filepath, 'rb') as f:
-                file_data = f.read()
-
-            # Send file size first
-            file_size = len(file_data)
-            self.client_socket.send(file_size.to_bytes(8, byteorder='big'))
-
-            # Send file data in chunks
-            chunk_size = 4096
-            for i in range(0, file_size, chunk_size):
-                chunk = file_data[i:i + chunk_size]
-                self.client_socket.send(chunk)
+                # Send file size first, held back to share a packet with the data
+                file_size = os.fstat(f.fileno()).st_size
+                self.client_socket.sendall(file_size.to_bytes(8, byteorder='big'), MSG_MORE if file_size else 0)
+
+                if self.zerocopy and file_size >= ZEROCOPY_MIN_SIZE:
+                    self._send_zerocopy(f, file_size)
+                elif hasattr(os, 'sendfile'):
+                    # Send file data (zero-copy via os.sendfile)
+                    self.client_socket.sendfile(f)
+                else:
+                    # Stream through one reusable buffer so memory stays at CHUNK_SIZE
+                    buf = bytearray(CHUNK_SIZE)
+                    view = memoryview(buf)
+                    while True:
+                        count = f.readinto(buf)
+                        if not count:
+                            break
+                        self.client_socket.sendall(view[:count])
 
             return True
         except Exception as e:
             print(f"[CLIENT] Error sending file: {e}")
             return False
 
+    def _send_zerocopy(self, f, file_size):
+        """Send file data with MSG_ZEROCOPY straight from an mmap of the file
+
+        The kernel pins the mapped pages instead of copying them, so the
+        mapping must stay alive until every send is reported complete on
+        the socket error queue.
+        """
+        calls = 0
+        completed = 0
+        with mmap.mmap(f.fileno(), file_size, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                sent = 0
+                while sent < file_size:
+                    try:
+                        sent += self.client_socket.sendmsg([view[sent:]], [], MSG_ZEROCOPY)
+                        calls += 1
+                    except OSError as e:
+                        if e.errno != errno.ENOBUFS:
+                            raise
+                        if completed == calls:
+                            # Nothing pinned to wait for, so zero-copy can't
+                            # be had at all; send the rest the ordinary way
+                            self.client_socket.sendall(view[sent:])
+                            break
+                        # Too many pinned sends outstanding; wait for some to finish
+                        completed = self._reap_zerocopy(completed, completed + 1)
+
+                completed = self._reap_zerocopy(completed, calls)
+            finally:
+                view.release()
+
+    def _reap_zerocopy(self, completed, target):
+        """Wait until MSG_ZEROCOPY sends up to target are complete; returns the new count"""
+        poller = select.poll()
+        # Error queue readiness is always reported as POLLERR
+        poller.register(self.client_socket, 0)
+        while completed < target:
+            try:
+                _, ancdata, _, _ = self.client_socket.recvmsg(
+                    0, socket.CMSG_SPACE(SOCK_EXTENDED_ERR.size), socket.MSG_ERRQUEUE)
+            except BlockingIOError:
+                for _, events in poller.poll():
+                    if events & (select.POLLHUP | select.POLLNVAL):
+                        raise ConnectionError("Connection closed during zero-copy send")
+                continue
+
+            for _, _, data in ancdata:
+                if len(data) < SOCK_EXTENDED_ERR.size:
+                    continue
+                _, origin, _, _, _, first, last = SOCK_EXTENDED_ERR.unpack_from(data)
+                if origin == SO_EE_ORIGIN_ZEROCOPY:
+                    # Notifications cover the inclusive range of send calls [first, last]
+                    completed = max(completed, last + 1)
+        return completed
+
     def receive_file_data(self, filepath):
         """Receive file data from server"""
         try:
             # Receive file size first
-            size_bytes = self.client_socket.recv(8)
-            if len(size_bytes) != 8:
+            size_bytes = self._recv_exact(8)
+            if size_bytes is None:
                 return False
 
             file_size = int.from_bytes(size_bytes, byteorder='big')
 
-            # Receive file data
+            # Receive file data into a single reusable buffer
+            buf = bytearray(CHUNK_SIZE)
+            view = memoryview(buf)
+            received = 0
             with open(filepath, 'wb') as f:
-                received = 0
                 while received < file_size:
-                    chunk = self.client_socket.recv(min(4096, file_size - received))
-                    if not chunk:
+                    count = self.client_socket.recv_into(view[:min(CHUNK_SIZE, file_size - received)])
+                    if not count:
                         break
-                    f.write(chunk)
-                    received += len(chunk)
+                    f.write(view[:count])
+                    received += count
 
             return received == file_size
         except Exception as e:
@@ -135,7 +326,7 @@ class FileClient:
                     for file_info in files:
                         name = file_info['name']
                         size = self.format_file_size(file_info['size'])
-                        modified = file_info['modified']
+                        modified = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(file_info['modified']))
                         print(f"{name:<30} {size:<15} {modified:<20}")
                     print(f"\nTotal files: {len(files)}")
                 else:
@@ -158,8 +349,10 @@ class FileClient:
 
             print(f"[CLIENT] Uploading {filename} ({self.format_file_size(file_size)})...")
 
-            # Send upload request
+            # Send upload request, with a checksum the server verifies if enabled
             request = {'command': 'UPLOAD', 'filename': filename}
+            if self.checksum:
+                request['sha256'] = self.file_digest(filepath)
             self.send_request(request)
 
             # Send file data
@@ -207,17 +400,21 @@ class FileClient:
 
     def delete_file(self, filename):
         """Delete file from server"""
+        self.delete_files([filename])
+
+    def delete_files(self, filenames):
+        """Delete files from server with a single pipelined round trip"""
         try:
-            print(f"[CLIENT] Deleting {filename}...")
+            print(f"[CLIENT] Deleting {', '.join(filenames)}...")
 
-            request = {'command': 'DELETE', 'filename': filename}
-            self.send_request(request)
-            response = self.receive_response()
+            requests = [{'command': 'DELETE', 'filename': filename} for filename in filenames]
+            responses = self.pipeline(requests)
 
-            if response and response.get('status') == 'success':
-                print(f"[SUCCESS] File deleted: {filename}")
-            else:
-                print(f"[ERROR] Delete failed: {response.get('message', 'Unknown error')}")
+            for filename, response in zip(filenames, responses):
+                if response and response.get('status') == 'success':
+                    print(f"[SUCCESS] File deleted: {filename}")
+                else:
+                    print(f"[ERROR] Delete failed: {response.get('message', 'Unknown error')}")
 
         except Exception as e:
             print(f"[CLIENT] Error deleting file: {e}")
@@ -227,13 +424,10 @@ class FileClient:
         if size_bytes == 0:
             return "0 B"
 
-        size_names = ["B", "KB", "MB", "GB"]
-        i = 0
-        while size_bytes >= 1024 and i < len(size_names) - 1:
-            size_bytes /= 1024
-            i += 1
-
-        return f"{size_bytes:.1f} {size_names[i]}"
+        # Each unit is 2**10 times the last, so the bit length picks it directly
+        size_names = ["B", "KB", "MB", "GB", "TB"]
+        i = min((size_bytes.bit_length() - 1) // 10, len(size_names) - 1)
+        return f"{size_bytes / (1 << (i * 10)):.1f} {size_names[i]}"
 
     def run_interactive(self):
         """Run interactive client"""
@@ -245,7 +439,7 @@ class FileClient:
         print("  list                    - List files on server")
         print("  upload <filepath>       - Upload file to server")
         print("  download <filename>     - Download file from server")
-        print("  delete <filename>       - Delete file from server")
+        print("  delete <filename> ...   - Delete files from server")
         print("  quit                    - Exit client")
         print("-" * 50)
 
@@ -275,13 +469,14 @@ class FileClient:
 
                 elif cmd == 'delete':
                     if len(command) > 1:
-                        confirm = input(f"Are you sure you want to delete '{command[1]}'? (y/N): ")
+                        names = "', '".join(command[1:])
+                        confirm = input(f"Are you sure you want to delete '{names}'? (y/N): ")
                         if confirm.lower() == 'y':
-                            self.delete_file(command[1])
+                            self.delete_files(command[1:])
                         else:
                             print("[INFO] Delete cancelled")
                     else:
-                        print("[ERROR] Usage: delete <filename>")
+                        print("[ERROR] Usage: delete <filename> ...")
 
                 elif cmd == 'quit':
                     break
@@ -291,7 +486,7 @@ class FileClient:
                     print("  list                    - List files on server")
                     print("  upload <filepath>       - Upload file to server")
                     print("  download <filename>     - Download file from server")
-                    print("  delete <filename>       - Delete file from server")
+                    print("  delete <filename> ...   - Delete files from server")
                     print("  quit                    - Exit client")
 
                 else:
@@ -1,63 +1,130 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
 import socket
-import threading
 import os
-import json
+import struct
+from stat import S_ISREG
+import tempfile
 import time
 import hashlib
-from datetime import datetime
+
+# orjson encodes straight to bytes and is several times faster; fall back
+# to the standard library when it isn't installed
+try:
+    import orjson
+    json_dumps = orjson.dumps
+except ImportError:
+    import json
+
+    def json_dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
+# Linux-only flag to hold back a short header until the payload follows
+MSG_MORE = getattr(socket, 'MSG_MORE', 0)
+
+# Per-call read size for file transfers and kernel socket buffer size
+CHUNK_SIZE = 64 * 1024
+SOCKET_BUFFER_SIZE = 1024 * 1024
+
+# How old the storage directory mtime must be before a listing is cached
+LIST_CACHE_SETTLE_NS = 1_000_000_000
+
+# Uploads are received into temp files in this subdirectory of the storage
+# directory, on the same filesystem, then renamed into place
+UPLOAD_TEMP_DIR = '.tmp'
+
+# Control frames: a request is opcode + digest length + filename length
+# followed by the filename and an optional SHA-256 digest of the upload; a
+# response is status + size + payload length followed by any remaining
+# response fields as JSON
+REQUEST_HEADER = struct.Struct('!BBH')
+RESPONSE_HEADER = struct.Struct('!BQI')
+OPCODES = {'LIST': 1, 'UPLOAD': 2, 'DOWNLOAD': 3, 'DELETE': 4, 'QUIT': 5}
+STATUSES = ('success', 'error')
+COMMANDS = {opcode: command for command, opcode in OPCODES.items()}
 
 class FileServer:
-    def __init__(self, host='localhost', port=8888, storage_dir='server_files'):
+    def __init__(self, host='localhost', port=8888, storage_dir='server_files', workers=None):
         self.host = host
         self.port = port
         self.storage_dir = storage_dir
+        self.storage_root = os.path.realpath(storage_dir)
+        self.temp_dir = os.path.join(self.storage_root, UPLOAD_TEMP_DIR)
+        # Worker processes sharing the port need SO_REUSEPORT to each get an accept queue
+        self.workers = (workers or os.cpu_count() or 1) if hasattr(socket, 'SO_REUSEPORT') else 1
         self.server_socket = None
         self.running = False
+        self.client_tasks = set()
+        # Mode for stored uploads, as open() would create them under the umask
+        umask = os.umask(0)
+        os.umask(umask)
+        self.file_mode = 0o666 & ~umask
+        # (directory mtime_ns, LIST response) reused until the directory changes
+        self._list_cache = None
 
         # Create storage directory if it doesn't exist
         if not os.path.exists(self.storage_dir):
             os.makedirs(self.storage_dir)
             print(f"[SERVER] Created storage directory: {self.storage_dir}")
 
-    def get_file_info(self, filename):
-        """Get file information"""
-        filepath = os.path.join(self.storage_dir, filename)
-        if os.path.exists(filepath):
-            stat = os.stat(filepath)
-            return {
-                'name': filename,
-                'size': stat.st_size,
-                'modified': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
-                'exists': True
-            }
-        return {'name': filename, 'exists': False}
+        # Temp files left here belong to uploads cut short by a crash
+        os.makedirs(self.temp_dir, exist_ok=True)
+        with os.scandir(self.temp_dir) as entries:
+            for entry in entries:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def _resolve(self, filename):
+        """Resolve filename to a path inside the storage directory
+
+        Raises ValueError for names that would escape it, such as
+        '../etc/passwd', absolute paths or symlinks pointing outside, and
+        for names inside the upload temp directory.
+        """
+        filepath = os.path.realpath(os.path.join(self.storage_root, filename))
+        if (not filepath.startswith(self.storage_root + os.sep)
+                or filepath == self.temp_dir
+                or filepath.startswith(self.temp_dir + os.sep)):
+            raise ValueError(f'Invalid filename: {filename}')
+        return filepath
 
     def list_files(self):
         """List all files in storage directory"""
         try:
-            files = []
-            for filename in os.listdir(self.storage_dir):
-                filepath = os.path.join(self.storage_dir, filename)
-                if os.path.isfile(filepath):
-                    files.append(self.get_file_info(filename))
-            return {'status': 'success', 'files': files}
-        except Exception as e:
-            return {'status': 'error', 'message': str(e)}
+            dir_mtime = os.stat(self.storage_dir).st_mtime_ns
+            if self._list_cache and self._list_cache[0] == dir_mtime:
+                return self._list_cache[1]
 
-    def store_file(self, filename, file_data):
-        """Store file to server"""
-        try:
-            filepath = os.path.join(self.storage_dir, filename)
-            with open(filepath, 'wb') as f:
-                f.write(file_data)
-            return {'status': 'success', 'message': f'File {filename} stored successfully', 'size': len(file_data)}
+            # scandir entries carry the file type from the directory read and
+            # cache their stat result, so each file costs at most one stat
+            files = []
+            with os.scandir(self.storage_dir) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        files.append({
+                            'name': entry.name,
+                            'size': stat.st_size,
+                            # Unix timestamp; clients format it for display
+                            'modified': int(stat.st_mtime)
+                        })
+            response = {'status': 'success', 'files': files}
+
+            # Only cache once the mtime is safely in the past, so a change
+            # landing in the same timestamp tick can't hide behind it
+            if time.time_ns() - dir_mtime > LIST_CACHE_SETTLE_NS:
+                self._list_cache = (dir_mtime, response)
+            return response
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
 
-    def delete_file(self, filename):
+    def delete_file(self, filename, filepath=None):
         """Delete file from server"""
         try:
-            filepath = os.path.join(self.storage_dir, filename)
+            filepath = filepath or self._resolve(filename)
             if os.path.exists(filepath):
                 os.remove(filepath)
                 return {'status': 'success', 'message': f'File {filename} deleted successfully'}
@@ -66,150 +133,324 @@ class FileServer:
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
 
-    def get_file(self, filename):
-        """Get file data for download"""
+    def get_file(self, filename, filepath=None):
+        """Open file for download; the caller must close the returned file"""
         try:
-            filepath = os.path.join(self.storage_dir, filename)
-            if os.path.exists(filepath):
-                with open(filepath, 'rb') as f:
-                    file_data = f.read()
-                return {'status': 'success', 'data': file_data, 'size': len(file_data)}
-            else:
+            filepath = filepath or self._resolve(filename)
+            # Hold the fd before announcing a size, so a delete or swap after
+            # this point can't leave the client waiting for data never sent
+            f = open(filepath, 'rb')
+        except (FileNotFoundError, IsADirectoryError):
+            return {'status': 'error', 'message': f'File {filename} not found'}
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
+        try:
+            stat = os.fstat(f.fileno())
+            if not S_ISREG(stat.st_mode):
+                f.close()
                 return {'status': 'error', 'message': f'File {filename} not found'}
+            return {'status': 'success', 'file': f, 'size': stat.st_size}
         except Exception as e:
+            f.close()
             return {'status': 'error', 'message': str(e)}
 
-    def send_response(self, client_socket, response):
+    async def send_response(self, client_socket, response):
         """Send response to client"""
         try:
-            response_json = json.dumps(response)
-            response_bytes = response_json.encode('utf-8')
-
-            # Send response length first
-            length = len(response_bytes)
-            client_socket.send(length.to_bytes(4, byteorder='big'))
-
-            # Send response data
-            client_socket.send(response_bytes)
+            # Status and size go in the fixed header, anything else as JSON
+            extra = {key: value for key, value in response.items() if key not in ('status', 'size')}
+            payload = json_dumps(extra) if extra else b''
+            header = RESPONSE_HEADER.pack(STATUSES.index(response['status']), response.get('size', 0), len(payload))
+
+            # Send header and payload in a single write
+            loop = asyncio.get_running_loop()
+            await loop.sock_sendall(client_socket, header + payload)
         except Exception as e:
             print(f"[SERVER] Error sending response: {e}")
 
-    def send_file_data(self, client_socket, file_data):
-        """Send file data to client"""
+    async def send_file_from_disk(self, client_socket, f, file_size):
+        """Send file_size bytes of open file f to client straight from disk, then close it"""
         try:
-            # Send file size first
-            file_size = len(file_data)
-            client_socket.send(file_size.to_bytes(8, byteorder='big'))
-
-            # Send file data in chunks
-            chunk_size = 4096
-            for i in range(0, file_size, chunk_size):
-                chunk = file_data[i:i + chunk_size]
-                client_socket.send(chunk)
+            loop = asyncio.get_running_loop()
+            with f:
+                # Send file size first, held back to share a packet with the data
+                size_bytes = file_size.to_bytes(8, byteorder='big')
+                try:
+                    sent = client_socket.send(size_bytes, MSG_MORE if file_size else 0)
+                except BlockingIOError:
+                    sent = 0
+                if sent < len(size_bytes):
+                    await loop.sock_sendall(client_socket, size_bytes[sent:])
+
+                # sock_sendfile uses os.sendfile where available and
+                # falls back to a read/send loop elsewhere. Send exactly the
+                # announced size; bytes appended meanwhile must not follow
+                sent = await loop.sock_sendfile(client_socket, f, 0, file_size)
+                if sent < file_size:
+                    # File shrank under us; the stream can't be kept in step
+                    client_socket.shutdown(socket.SHUT_RDWR)
         except Exception as e:
             print(f"[SERVER] Error sending file data: {e}")
 
-    def receive_file_data(self, client_socket):
-        """Receive file data from client"""
-        try:
-            # Receive file size first
-            size_bytes = client_socket.recv(8)
-            if len(size_bytes) != 8:
+    async def _recv_exact(self, client_socket, n):
+        """Receive exactly n bytes from client, or None if the connection closes"""
+        loop = asyncio.get_running_loop()
+        buf = bytearray(n)
+        view = memoryview(buf)
+        received = 0
+        while received < n:
+            count = await loop.sock_recv_into(client_socket, view[received:])
+            if not count:
                 return None
-
-            file_size = int.from_bytes(size_bytes, byteorder='big')
-
-            # Receive file data
-            file_data = b''
-            while len(file_data) < file_size:
-                chunk = client_socket.recv(min(4096, file_size - len(file_data)))
-                if not chunk:
-                    break
-                file_data += chunk
-
-            return file_data
+            received += count
+        return buf
+
+    def _decode_request(self, opcode, name_length, body):
+        """Decode a binary request frame into a request dict"""
+        return {
+            'command': COMMANDS.get(opcode, str(opcode)),
+            'filename': body[:name_length].decode('utf-8'),
+            'sha256': bytes(body[name_length:]) or None
+        }
+
+    async def receive_file_data(self, client_socket, filepath, sha256=None):
+        """Stream file data from client into a temp file, then move it to filepath
+
+        Returns None on success, otherwise an error message. When sha256 is
+        given the data is hashed as it arrives and must match it. The stored
+        copy is only replaced once the whole file has arrived and checked out.
+        """
+        # Receive file size first
+        size_bytes = await self._recv_exact(client_socket, 8)
+        if size_bytes is None:
+            return 'Failed to receive file data'
+
+        file_size = int.from_bytes(size_bytes, byteorder='big')
+
+        digest = hashlib.sha256() if sha256 else None
+        received = 0
+        # Body bytes still to be read from the socket; None while mid-body
+        unread = file_size
+        temp_path = None
+        loop = asyncio.get_running_loop()
+        try:
+            # A temp file beside the target keeps failed or concurrent uploads
+            # from truncating or interleaving with the stored copy
+            fd, temp_path = tempfile.mkstemp(dir=self.temp_dir)
+            with open(fd, 'wb') as f:
+                # mkstemp creates files 0600; give them the usual umask-based mode
+                os.fchmod(f.fileno(), self.file_mode)
+                if file_size and hasattr(os, 'posix_fallocate'):
+                    # Where the filesystem lacks fallocate, glibc emulates it by
+                    # writing every block, so keep it off the event loop
+                    await loop.run_in_executor(None, self._preallocate, f.fileno(), file_size)
+
+                unread = None
+                if digest is None and hasattr(os, 'splice'):
+                    # Nothing to hash, so the data never needs to reach userspace
+                    received = await self._splice_recv(client_socket, f.fileno(), file_size)
+                else:
+                    # Receive file data into a single reusable buffer
+                    buf = bytearray(CHUNK_SIZE)
+                    view = memoryview(buf)
+                    while received < file_size:
+                        count = await loop.sock_recv_into(client_socket, view[:min(CHUNK_SIZE, file_size - received)])
+                        if not count:
+                            break
+                        f.write(view[:count])
+                        if digest:
+                            digest.update(view[:count])
+                        received += count
+                unread = file_size - received
+
+            if received != file_size:
+                return 'Failed to receive file data'
+            if digest and digest.digest() != sha256:
+                return 'Checksum mismatch'
+
+            # The rename also updates the directory mtime, which invalidates
+            # cached listings in every worker
+            os.replace(temp_path, filepath)
+            temp_path = None
+            return None
         except Exception as e:
             print(f"[SERVER] Error receiving file data: {e}")
-            return None
+            if unread is None:
+                # Unknown how much of the body was consumed; the caller drops
+                # the connection rather than parse file data as requests
+                raise
+            # Consume what's left of the body so the stream stays in step
+            await self._discard(client_socket, unread)
+            return 'Failed to store file'
+        finally:
+            # Don't leave a truncated or corrupt upload behind
+            if temp_path is not None:
+                os.remove(temp_path)
+
+    def _preallocate(self, fd, file_size):
+        """Reserve file_size bytes for fd ahead of an upload"""
+        # Lets the filesystem lay the file out in as few extents as possible;
+        # purely a hint, so failures are ignored
+        try:
+            os.posix_fallocate(fd, 0, file_size)
+            os.posix_fadvise(fd, 0, file_size, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+    async def _discard_file_data(self, client_socket):
+        """Read and drop a size-prefixed file body from client"""
+        size_bytes = await self._recv_exact(client_socket, 8)
+        if size_bytes is not None:
+            await self._discard(client_socket, int.from_bytes(size_bytes, byteorder='big'))
+
+    async def _discard(self, client_socket, remaining):
+        """Read and drop remaining bytes from client"""
+        loop = asyncio.get_running_loop()
+        buf = bytearray(CHUNK_SIZE)
+        view = memoryview(buf)
+        while remaining > 0:
+            count = await loop.sock_recv_into(client_socket, view[:min(CHUNK_SIZE, remaining)])
+            if not count:
+                break
+            remaining -= count
+
+    async def _splice_recv(self, client_socket, out_fd, total):
+        """Move up to total bytes from client socket to out_fd in kernel via a pipe
+
+        Returns the number of bytes moved, which is short of total only if
+        the client disconnects.
+        """
+        pipe_r, pipe_w = os.pipe()
+        try:
+            moved = 0
+            while moved < total:
+                try:
+                    count = os.splice(client_socket.fileno(), pipe_w, min(CHUNK_SIZE, total - moved),
+                                      flags=os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK)
+                except BlockingIOError:
+                    await self._wait_readable(client_socket)
+                    continue
+                if not count:
+                    break
 
-    def handle_client(self, client_socket, address):
+                # Drain the pipe into the file before reading more
+                while count:
+                    written = os.splice(pipe_r, out_fd, count, flags=os.SPLICE_F_MOVE)
+                    count -= written
+                    moved += written
+            return moved
+        finally:
+            os.close(pipe_r)
+            os.close(pipe_w)
+
+    async def _wait_readable(self, client_socket):
+        """Wait until client socket has data to read"""
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        loop.add_reader(client_socket.fileno(), lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            loop.remove_reader(client_socket.fileno())
+
+    async def handle_client(self, client_socket, address):
         """Handle client requests"""
         print(f"[SERVER] Client connected from {address}")
 
+        loop = asyncio.get_running_loop()
         try:
             while True:
-                # Receive request length
-                length_bytes = client_socket.recv(4)
-                if not length_bytes:
+                # Receive fixed request header
+                header = await self._recv_exact(client_socket, REQUEST_HEADER.size)
+                if header is None:
                     break
 
-                request_length = int.from_bytes(length_bytes, byteorder='big')
+                opcode, digest_length, name_length = REQUEST_HEADER.unpack(header)
 
-                # Receive request data
-                request_data = client_socket.recv(request_length)
-                if not request_data:
+                # Receive filename and digest
+                body = await self._recv_exact(client_socket, name_length + digest_length)
+                if body is None:
                     break
 
                 try:
-                    request = json.loads(request_data.decode('utf-8'))
+                    request = self._decode_request(opcode, name_length, body)
                     command = request.get('command', '')
 
                     print(f"[SERVER] Received command: {command} from {address}")
 
                     if command == 'LIST':
-                        response = self.list_files()
-                        self.send_response(client_socket, response)
+                        response = await loop.run_in_executor(None, self.list_files)
+                        await self.send_response(client_socket, response)
 
                     elif command == 'UPLOAD':
                         filename = request.get('filename', '')
                         if filename:
-                            file_data = self.receive_file_data(client_socket)
-                            if file_data is not None:
-                                response = self.store_file(filename, file_data)
+                            try:
+                                filepath = self._resolve(filename)
+                            except ValueError:
+                                # Consume the upload body so it isn't parsed as requests
+                                await self._discard_file_data(client_socket)
+                                raise
+                            error = await self.receive_file_data(client_socket, filepath, request['sha256'])
+                            if error is None:
+                                response = {'status': 'success', 'message': f'File {filename} stored successfully',
+                                            'size': os.path.getsize(filepath)}
                             else:
-                                response = {'status': 'error', 'message': 'Failed to receive file data'}
+                                response = {'status': 'error', 'message': error}
                         else:
+                            await self._discard_file_data(client_socket)
                             response = {'status': 'error', 'message': 'Filename not provided'}
 
-                        self.send_response(client_socket, response)
+                        await self.send_response(client_socket, response)
 
                     elif command == 'DOWNLOAD':
                         filename = request.get('filename', '')
                         if filename:
-                            result = self.get_file(filename)
+                            result = self.get_file(filename, self._resolve(filename))
                             if result['status'] == 'success':
                                 # Send success response first
                                 response = {'status': 'success', 'size': result['size']}
-                                self.send_response(client_socket, response)
-                                # Then send file data
-                                self.send_file_data(client_socket, result['data'])
+                                try:
+                                    await self.send_response(client_socket, response)
+                                finally:
+                                    # Then send file data; this also closes the file
+                                    await self.send_file_from_disk(client_socket, result['file'], result['size'])
                             else:
-                                self.send_response(client_socket, result)
+                                await self.send_response(client_socket, result)
                         else:
                             response = {'status': 'error', 'message': 'Filename not provided'}
-                            self.send_response(client_socket, response)
+                            await self.send_response(client_socket, response)
 
                     elif command == 'DELETE':
                         filename = request.get('filename', '')
                         if filename:
-                            response = self.delete_file(filename)
+                            response = await loop.run_in_executor(None, self.delete_file, filename,
+                                                                  self._resolve(filename))
                         else:
                             response = {'status': 'error', 'message': 'Filename not provided'}
 
-                        self.send_response(client_socket, response)
+                        await self.send_response(client_socket, response)
 
                     elif command == 'QUIT':
                         response = {'status': 'success', 'message': 'Goodbye!'}
-                        self.send_response(client_socket, response)
+                        await self.send_response(client_socket, response)
                         break
 
                     else:
                         response = {'status': 'error', 'message': f'Unknown command: {command}'}
-                        self.send_response(client_socket, response)
+                        await self.send_response(client_socket, response)
 
-                except json.JSONDecodeError:
+                except UnicodeDecodeError:
+                    if opcode == OPCODES['UPLOAD']:
+                        # The file body still follows the undecodable name
+                        await self._discard_file_data(client_socket)
                     response = {'status': 'error', 'message': 'Invalid request format'}
-                    self.send_response(client_socket, response)
+                    await self.send_response(client_socket, response)
+
+                except ValueError as e:
+                    # Filename rejected by _resolve
+                    response = {'status': 'error', 'message': str(e)}
+                    await self.send_response(client_socket, response)
 
         except Exception as e:
             print(f"[SERVER] Error handling client {address}: {e}")
@@ -219,34 +460,77 @@ class FileServer:
 
     def start_server(self):
         """Start the file server"""
+        if self.workers <= 1:
+            self.serve_one()
+            return
+
+        # Each worker binds its own SO_REUSEPORT socket and the kernel
+        # spreads incoming connections across their accept queues
+        print(f"[SERVER] Starting {self.workers} worker processes")
+        processes = [multiprocessing.Process(target=self.serve_worker, daemon=True)
+                     for _ in range(self.workers)]
+        for process in processes:
+            process.start()
         try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(5)
-            self.running = True
-
-            print(f"[SERVER] File server started on {self.host}:{self.port}")
-            print(f"[SERVER] Storage directory: {os.path.abspath(self.storage_dir)}")
-            print("[SERVER] Waiting for clients...")
+            for process in processes:
+                process.join()
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
 
-            while self.running:
-                try:
-                    client_socket, address = self.server_socket.accept()
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, address)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
-                except OSError:
-                    break
+    def serve_worker(self):
+        """Run one worker process until interrupted"""
+        try:
+            self.serve_one()
+        except KeyboardInterrupt:
+            pass
 
+    def serve_one(self):
+        """Run the event loop for a single listening socket"""
+        try:
+            asyncio.run(self.serve())
         except Exception as e:
             print(f"[SERVER] Error starting server: {e}")
         finally:
             self.stop_server()
 
+    async def serve(self):
+        """Accept clients and serve each one as a task on the event loop"""
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.workers > 1:
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        # Accepted sockets inherit these buffer sizes from the listening socket
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        self.server_socket.bind((self.host, self.port))
+        self.server_socket.listen(5)
+        self.server_socket.setblocking(False)
+        self.running = True
+
+        print(f"[SERVER] File server started on {self.host}:{self.port}")
+        print(f"[SERVER] Storage directory: {os.path.abspath(self.storage_dir)}")
+        print("[SERVER] Waiting for clients...")
+
+        # Blocking directory work runs on a bounded pool so a burst of
+        # clients can't spawn unbounded threads or stall the event loop.
+        # The cap is for the whole server, split across worker processes
+        max_threads = min(32, (os.cpu_count() or 1) * 8)
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=max(1, max_threads // self.workers)))
+        while self.running:
+            try:
+                client_socket, address = await loop.sock_accept(self.server_socket)
+                # Disable Nagle so small responses aren't delayed
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                task = loop.create_task(self.handle_client(client_socket, address))
+                # Keep a reference so the task isn't garbage collected mid-run
+                self.client_tasks.add(task)
+                task.add_done_callback(self.client_tasks.discard)
+            except OSError:
+                break
+
     def stop_server(self):
         """Stop the file server"""
         self.running = False